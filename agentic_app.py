@@ -7,59 +7,20 @@ st.set_page_config(
     page_icon="🤖",
     layout="wide"
 )
-from langchain_community.chat_models import ChatOllama
-try:
-    from langchain_groq import ChatGroq
-except ImportError:
-    # Fallback if langchain_groq is not available
-    ChatGroq = None
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.pydantic_v1 import BaseModel, Field
-from langchain.output_parsers import PydanticOutputParser
-from langchain_community.graphs import Neo4jGraph
-from langchain_community.utilities.sql_database import SQLDatabase
-import psycopg2
-from neo4j import GraphDatabase
-from typing import TypedDict, Annotated
+# Heavy dependencies (LangChain, database drivers, pandas) are imported where
+# they are used so the page renders without paying their import cost.
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import importlib.util
 import json
+import re
+from pathlib import Path
+import time
+from typing import Final
 
-# App title and description 
-st.title("Agentic Database Query Generator")
-st.markdown("""
-This application generates SQL and Cypher queries from natural language questions,
-grades them for schema relevance, and executes them against PostgreSQL and Neo4j databases.
-""")
-
-# Create a two-column layout for the database configuration
-left_col, right_col = st.columns(2)
-
-# Left column - Neo4j Configuration
-with left_col:
-    with st.expander("Neo4j Configuration", expanded=False):
-        neo4j_uri = st.text_input("Neo4j URI", value="bolt://localhost:7687")
-        neo4j_username = st.text_input("Neo4j Username", value="neo4j")
-        neo4j_password = st.text_input("Neo4j Password", type="password", value="root1234")
-
-# Right column - PostgreSQL Configuration
-with right_col:
-    with st.expander("PostgreSQL Configuration", expanded=False):
-        pg_host = st.text_input("PostgreSQL Host", value="localhost")
-        pg_port = st.text_input("PostgreSQL Port", value="5432")
-        pg_database = st.text_input("PostgreSQL Database", value="postgres")
-        pg_username = st.text_input("PostgreSQL Username", value="postgres")
-        pg_password = st.text_input("PostgreSQL Password", type="password", value="root")
-
-# Create another two-column layout for the schema configuration
-col1, col2 = st.columns(2)
-
-# Left column - Neo4j Schema
-with col1:
-    with st.expander("Neo4j Schema", expanded=False):
-        neo4j_schema = st.text_area(
-            "Neo4j Graph Schema",
-            height=200,
-            value="""Node properties:
+# Default schemas shown in the schema text areas
+DEFAULT_NEO4J_SCHEMA: Final[str] = """Node properties:
 - User: {user_id: INTEGER, username: STRING, email: STRING}
 - Course: {course_id: INTEGER, title: STRING, description: STRING, price: FLOAT, level: STRING}
 - Instructor: {instructor_id: INTEGER, name: STRING, bio: STRING, email: STRING}
@@ -68,15 +29,9 @@ Relationships:
 - (User)-[:ENROLLED_IN]->(Course)
 - (User)-[:REVIEWED]->(Course) {rating: INTEGER, comment: STRING}
 - (Instructor)-[:TEACHES]->(Course)
-""")
+"""
 
-# Right column - SQL Schema
-with col2:
-    with st.expander("SQL Schema", expanded=False):
-        sql_ddl_schema = st.text_area(
-            "SQL DDL Schema",
-            height=200,
-            value="""CREATE TABLE users (
+DEFAULT_SQL_SCHEMA: Final[str] = """CREATE TABLE users (
     user_id SERIAL PRIMARY KEY,
     username VARCHAR(50) UNIQUE NOT NULL,
     email VARCHAR(100) UNIQUE NOT NULL,
@@ -125,138 +80,670 @@ CREATE TABLE course_instructors (
     instructor_id INTEGER REFERENCES instructors(instructor_id),
     PRIMARY KEY (course_id, instructor_id)
 );"""
-    )
+
+# Read the workflow image once instead of on every rerun
+@st.cache_data
+def load_graph_image(path):
+    return Path(path).read_bytes()
+
+# App title and description 
+st.title("Agentic Database Query Generator")
+st.markdown("""
+This application generates SQL and Cypher queries from natural language questions,
+grades them for schema relevance, and executes them against PostgreSQL and Neo4j databases.
+""")
+
+# Create a two-column layout for the database configuration
+left_col, right_col = st.columns(2)
+
+# Left column - Neo4j Configuration
+with left_col:
+    with st.expander("Neo4j Configuration", expanded=False):
+        neo4j_uri = st.text_input("Neo4j URI", value="bolt://localhost:7687")
+        neo4j_username = st.text_input("Neo4j Username", value="neo4j")
+        neo4j_password = st.text_input("Neo4j Password", type="password", value="root1234")
+
+# Right column - PostgreSQL Configuration
+with right_col:
+    with st.expander("PostgreSQL Configuration", expanded=False):
+        pg_host = st.text_input("PostgreSQL Host", value="localhost")
+        pg_port = st.text_input("PostgreSQL Port", value="5432")
+        pg_database = st.text_input("PostgreSQL Database", value="postgres")
+        pg_username = st.text_input("PostgreSQL Username", value="postgres")
+        pg_password = st.text_input("PostgreSQL Password", type="password", value="root")
+
+# Create another two-column layout for the schema configuration
+col1, col2 = st.columns(2)
+
+# Left column - Neo4j Schema
+with col1:
+    with st.expander("Neo4j Schema", expanded=False):
+        neo4j_schema = st.text_area(
+            "Neo4j Graph Schema",
+            height=200,
+            value=DEFAULT_NEO4J_SCHEMA
+        )
+
+# Right column - SQL Schema
+with col2:
+    with st.expander("SQL Schema", expanded=False):
+        sql_ddl_schema = st.text_area(
+            "SQL DDL Schema",
+            height=200,
+            value=DEFAULT_SQL_SCHEMA
+        )
 
 # LangGraph Visualization Section
 st.header("LangGraph Workflow Visualization")
-st.image("output.png", use_column_width=False)
+st.image(load_graph_image("output.png"), use_column_width=False)
 st.markdown("*The above graph shows the agentic workflow for query generation and execution.*")
 
 # Query Generator Section
 st.header("Query Generator")
 
-# Question input
-question = st.text_area("Enter your question", height=100, placeholder="What courses are taught by instructors with 'AI' in their bio?")
-
-# API Key for model
-with st.expander("Model Configuration", expanded=False):
-    groq_api_key = st.text_input("GROQ API Key", type="password")
-    if groq_api_key:
-        os.environ["GROQ_API_KEY"] = groq_api_key
-
-# Process button
-if st.button("Generate Queries and Execute"):
-    if not question:
-        st.error("Please enter a question.")
-    elif not groq_api_key:
-        st.error("GROQ API Key not set. Please add it above.")
-    else:
-        with st.spinner("Generating queries and executing..."):
-            try:
-                # Initialize model
-                if ChatGroq is None:
-                    st.error("ChatGroq is not available. Please install langchain_groq package with: pip install langchain_groq")
-                    st.stop()
-                model = ChatGroq(model="llama3-70b-8192")
-                
-                # Define SQL generation prompt
-                sql_prompt = ChatPromptTemplate.from_template("""
-                You are a SQL expert. Given the following SQL DDL schema and a question, generate a SQL query that answers the question.
-                
-                SQL DDL Schema:
-                {ddl_schema}
-                
-                Question: {question}
-                
-                SQL Query:
-                """)
-                
-                # Define Cypher generation prompt
-                cypher_prompt = ChatPromptTemplate.from_template("""
-                You are a Neo4j Cypher expert. Given the following Neo4j schema and a question, generate a Cypher query that answers the question.
-                
-                Neo4j Schema:
-                {schema}
-                
-                Question: {question}
-                
-                Cypher Query:
-                """)
-                
-                # Create chains
-                sql_chain = sql_prompt | model | StrOutputParser()
-                cypher_chain = cypher_prompt | model | StrOutputParser()
-                
-                # Generate queries
-                sql_query = sql_chain.invoke({
-                    "ddl_schema": sql_ddl_schema,
-                    "question": question
-                })
-                sql_query = sql_query.replace("<s> ", "").replace("`", "")
-                
-                cypher_query = cypher_chain.invoke({
-                    "schema": neo4j_schema,
-                    "question": question
-                })
-                
-                # Execute SQL query
-                try:
-                    conn = psycopg2.connect(
-                        host=pg_host,
-                        port=pg_port,
-                        dbname=pg_database,
-                        user=pg_username,
-                        password=pg_password
-                    )
-                    cursor = conn.cursor()
-                    cursor.execute(sql_query)
-                    sql_results = cursor.fetchall()
-                    cursor.close()
-                    conn.close()
-                except Exception as e:
-                    sql_results = f"Error executing SQL query: {str(e)}"
-                
-                # Execute Cypher query
+# Reuse one PostgreSQL connection pool per set of credentials
+pg_pool_key = (pg_host, pg_port, pg_database, pg_username, pg_password)
+if st.session_state.get("pg_pool_key") != pg_pool_key:
+    if "pg_pool" in st.session_state:
+        st.session_state["pg_pool"].closeall()
+        del st.session_state["pg_pool"]
+    st.session_state["pg_pool_key"] = pg_pool_key
+
+def get_pg_pool():
+    if "pg_pool" not in st.session_state:
+        import psycopg2.extensions
+        import psycopg2.pool
+
+        class PreparingConnection(psycopg2.extensions.connection):
+            """Connection that remembers which statements were PREPAREd on it, least recently used first."""
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.prepared_statements = OrderedDict()
+
+        st.session_state["pg_pool"] = psycopg2.pool.ThreadedConnectionPool(
+            1, 8,
+            host=pg_host,
+            port=pg_port,
+            dbname=pg_database,
+            user=pg_username,
+            password=pg_password,
+            connection_factory=PreparingConnection
+        )
+        st.session_state["pg_seen_queries"] = {}
+    return st.session_state["pg_pool"]
+
+# Keep the Neo4j driver (and its Bolt connection pool) alive across reruns.
+# The cache is process-wide and keyed on the credentials, so other sessions
+# may share a driver and new credentials simply get their own. It is bounded so
+# every credential set ever entered doesn't keep a driver and its Bolt pool alive.
+NEO4J_DRIVER_CACHE_SIZE = 4
+
+@st.cache_resource(max_entries=NEO4J_DRIVER_CACHE_SIZE)
+def get_neo4j_driver(uri, user, password):
+    from neo4j import GraphDatabase
+    return GraphDatabase.driver(uri, auth=(user, password), max_connection_pool_size=10)
+
+GROQ_MODEL_NAME = "llama3-70b-8192"
+
+# Reuse the model (and its HTTP connection pool to Groq) across reruns
+@st.cache_resource
+def get_model(api_key):
+    from langchain_groq import ChatGroq
+    return ChatGroq(model=GROQ_MODEL_NAME, api_key=api_key)
+
+# Seconds a generated query pair stays valid in the LLM cache
+LLM_CACHE_TTL = 3600
+# Entries kept in the process-wide LLM cache before the oldest are dropped
+LLM_CACHE_MAX_ENTRIES = 1000
+
+@st.cache_resource
+def get_llm_cache():
+    """Process-wide map of cache key -> (timestamp, (sql_query, cypher_query))."""
+    return {}
+
+def llm_cache_key(question, ddl_schema, neo4j_schema, model_name):
+    """Hash the generation inputs into an exact-match cache key."""
+    key = json.dumps([question, ddl_schema, neo4j_schema, model_name])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+# Cosine similarity above which a previous question's queries are reused
+SEMANTIC_CACHE_THRESHOLD = 0.87
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+@st.cache_resource
+def get_embedding_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDING_MODEL_NAME)
+
+# Nearest neighbours checked per lookup, so invalidated entries don't hide valid ones
+SEMANTIC_CACHE_CANDIDATES = 4
+
+def get_semantic_cache(scope):
+    """Return this session's (FAISS index, [(question, sql, cypher) or None]) for a schema/model scope.
+
+    Entries are set to None instead of removed so they stay aligned with the index ids.
+    """
+    caches = st.session_state.setdefault("semantic_cache", {})
+    if scope not in caches:
+        import faiss
+        dim = get_embedding_model().get_sentence_embedding_dimension()
+        caches[scope] = (faiss.IndexFlatIP(dim), [])
+    return caches[scope]
+
+def semantic_cache_lookup(question, scope):
+    """Embed the question and return (embedding, closest cached entry above the threshold or None)."""
+    # Semantic caching is optional; fall back to exact-match caching only
+    if importlib.util.find_spec("faiss") is None or importlib.util.find_spec("sentence_transformers") is None:
+        return None, None
+    if st.session_state.get("semantic_cache_disabled"):
+        return None, None
+    try:
+        index, entries = get_semantic_cache(scope)
+        vec = get_embedding_model().encode([question], normalize_embeddings=True)
+        if index.ntotal:
+            scores, ids = index.search(vec, min(index.ntotal, SEMANTIC_CACHE_CANDIDATES))
+            for score, idx in zip(scores[0], ids[0]):
+                if score < SEMANTIC_CACHE_THRESHOLD:
+                    break
+                if entries[idx] is not None:
+                    return vec, entries[idx]
+        return vec, None
+    except Exception as e:
+        # e.g. the embedding model can't be downloaded; don't retry it on every question
+        st.session_state["semantic_cache_disabled"] = True
+        st.warning(f"Semantic cache unavailable, using exact-match caching only: {str(e)}")
+        return None, None
+
+def semantic_cache_add(scope, vec, question, sql_query, cypher_query):
+    if vec is None:
+        return
+    try:
+        index, entries = get_semantic_cache(scope)
+        index.add(vec)
+        entries.append((question, sql_query, cypher_query))
+    except Exception as e:
+        st.session_state["semantic_cache_disabled"] = True
+        st.warning(f"Semantic cache unavailable, using exact-match caching only: {str(e)}")
+
+def semantic_cache_forget(scope, sql_query, cypher_query):
+    """Invalidate every entry in this session's semantic cache that holds the given query pair."""
+    caches = st.session_state.get("semantic_cache", {})
+    if scope not in caches:
+        return
+    _, entries = caches[scope]
+    for i, entry in enumerate(entries):
+        if entry is not None and entry[1:] == (sql_query, cypher_query):
+            entries[i] = None
+
+# Everything before the question is identical across calls with the same schemas,
+# so keep it first to get hits on the provider's prompt-prefix cache.
+QUERIES_PROMPT_TEMPLATE = """You are a SQL and Neo4j Cypher expert. Given the following SQL DDL schema, Neo4j schema and a question, generate a SQL query and a Cypher query that answer the question.
+
+SQL DDL Schema:
+{ddl_schema}
+
+Neo4j Schema:
+{schema}
+
+{format_instructions}
+
+Question: {question}"""
+
+# Minimum seconds between UI refreshes while streaming model output
+STREAM_RENDER_INTERVAL = 0.05
+
+@st.cache_resource
+def get_queries_parser():
+    """Build the parser for the {"sql": ..., "cypher": ...} object the model returns."""
+    from langchain_core.pydantic_v1 import BaseModel, Field
+    from langchain.output_parsers import PydanticOutputParser
+
+    class Queries(BaseModel):
+        """SQL and Cypher queries generated for a single question."""
+        sql: str = Field(description="PostgreSQL query that answers the question")
+        cypher: str = Field(description="Neo4j Cypher query that answers the question")
+
+    return PydanticOutputParser(pydantic_object=Queries)
+
+# Build the generation chain once per API key instead of on every click
+@st.cache_resource
+def get_queries_chain(api_key):
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+
+    queries_prompt = ChatPromptTemplate.from_template(QUERIES_PROMPT_TEMPLATE).partial(
+        format_instructions=get_queries_parser().get_format_instructions()
+    )
+    return queries_prompt | get_model(api_key) | StrOutputParser()
+
+# Times a query that fails local validation is sent back to the model for repair
+MAX_REPAIR_ATTEMPTS = 2
+
+REPAIR_PROMPT_TEMPLATE = """You are a {language} expert. The {language} query below was generated for the following schema but failed validation. Fix it so it is valid and still answers the original question. Return only the corrected query, with no explanation.
+
+Schema:
+{schema}
+
+Question: {question}
+
+Query:
+{query}
+
+Validation error: {error}"""
+
+@st.cache_resource
+def get_repair_chain(api_key):
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+
+    repair_prompt = ChatPromptTemplate.from_template(REPAIR_PROMPT_TEMPLATE)
+    return repair_prompt | get_model(api_key) | StrOutputParser()
+
+_CYPHER_MATCH = re.compile(r"\bMATCH\b", re.IGNORECASE)
+_CYPHER_RETURN = re.compile(r"\bRETURN\b", re.IGNORECASE)
+
+def validate_sql(sql_query):
+    """Parse the query locally and return the tokenize/parse error, or None if it looks valid."""
+    # Validation is optional; without sqlglot the database reports syntax errors
+    if importlib.util.find_spec("sqlglot") is None:
+        if not st.session_state.get("sql_validation_warned"):
+            st.session_state["sql_validation_warned"] = True
+            st.warning("sqlglot is not installed, so generated SQL is not validated or repaired before execution.")
+        return None
+    import sqlglot
+    from sqlglot.errors import SqlglotError
+    try:
+        sqlglot.parse_one(sql_query, read="postgres")
+    except SqlglotError as e:
+        return str(e)
+    return None
+
+def validate_cypher(cypher_query):
+    """Sanity-check that a read query has MATCH and RETURN clauses."""
+    if not _CYPHER_MATCH.search(cypher_query):
+        return "Cypher query has no MATCH clause"
+    if not _CYPHER_RETURN.search(cypher_query):
+        return "Cypher query has no RETURN clause"
+    return None
+
+# Markdown code fence, with an optional language tag, around a generated query
+_CODE_FENCE = re.compile(r"```(?:[\w-]*\n)?(.*?)(?:```|$)", re.DOTALL)
+
+def strip_code_fences(query):
+    """Return the contents of the first ``` fence in the query, or the query itself."""
+    match = _CODE_FENCE.search(query)
+    return (match.group(1) if match else query).strip()
+
+# Tokens stripped from generated SQL; extend the alternation to drop more
+_SQL_CLEAN = re.compile(r"<s> |`")
+
+def clean_sql_query(sql_query):
+    """Strip code fences, the tokenizer marker and stray backticks the model tends to emit."""
+    return _SQL_CLEAN.sub("", strip_code_fences(sql_query))
+
+def repair_query(api_key, language, schema, question, query, validate, clean=strip_code_fences):
+    """Ask the model to fix a query until it passes validation or attempts run out."""
+    error = validate(query)
+    attempts = 0
+    while error is not None and attempts < MAX_REPAIR_ATTEMPTS:
+        query = get_repair_chain(api_key).invoke({
+            "language": language,
+            "schema": schema,
+            "question": question,
+            "query": query,
+            "error": error
+        })
+        query = clean(query)
+        error = validate(query)
+        attempts += 1
+    return query
+
+# Rows fetched per round trip from the PostgreSQL server-side cursor
+SQL_FETCH_SIZE = 1000
+
+# Prepared statements kept per pooled connection before the least recently used is deallocated
+MAX_PREPARED_STATEMENTS = 32
+
+def run_sql_query(pg_pool, sql_query, seen_queries):
+    """Execute a SQL query on a pooled connection and return (results, error).
+
+    ``seen_queries`` maps the statement names of queries that ran successfully
+    this session to the number of rows they returned. A repeated query whose
+    last result fit in one fetch is run as a prepared statement so PostgreSQL
+    can skip re-planning it. DECLARE CURSOR cannot wrap EXECUTE, so that path
+    downloads the result in one go; larger results keep streaming through the
+    server-side cursor, where planning is a small share of the cost.
+    """
+    import pandas as pd
+    stmt_name = "stmt_" + hashlib.sha256(sql_query.encode()).hexdigest()[:16]
+    use_prepared = seen_queries.get(stmt_name, SQL_FETCH_SIZE + 1) <= SQL_FETCH_SIZE
+    try:
+        conn = pg_pool.getconn()
+        try:
+            if use_prepared:
+                cursor = conn.cursor()
+                prepared = conn.prepared_statements
+                if stmt_name in prepared:
+                    prepared.move_to_end(stmt_name)
+                else:
+                    if len(prepared) >= MAX_PREPARED_STATEMENTS:
+                        oldest = next(iter(prepared))
+                        cursor.execute(f"DEALLOCATE {oldest}")
+                        del prepared[oldest]
+                    cursor.execute(f"PREPARE {stmt_name} AS {sql_query.strip().rstrip(';')}")
+                    # Prepared statements survive a rollback, so record it right away
+                    prepared[stmt_name] = None
+                cursor.execute(f"EXECUTE {stmt_name}")
+                results = pd.DataFrame(cursor.fetchall(), columns=[d[0] for d in cursor.description])
+            else:
+                # Server-side cursor so large results are pulled in chunks
+                cursor = conn.cursor(name="stream_cur")
+                cursor.itersize = SQL_FETCH_SIZE
+                cursor.execute(sql_query)
+                chunks = []
+                while rows := cursor.fetchmany(SQL_FETCH_SIZE):
+                    chunks.append(pd.DataFrame(rows, columns=[d[0] for d in cursor.description]))
+                if chunks:
+                    results = pd.concat(chunks, ignore_index=True)
+                else:
+                    results = pd.DataFrame(columns=[d[0] for d in cursor.description or []])
+            cursor.close()
+        finally:
+            # Results are only read, so never keep changes made by generated SQL;
+            # this also avoids returning an aborted transaction to the pool
+            conn.rollback()
+            pg_pool.putconn(conn)
+        # Only successful runs count, so a query that failed isn't prepared next time
+        seen_queries[stmt_name] = len(results)
+        return results, None
+    except Exception as e:
+        return None, str(e)
+
+def run_cypher_query(driver, cypher_query):
+    """Execute a Cypher query in its own driver session and return (results, error)."""
+    import pandas as pd
+    from neo4j.graph import Node, Path, Relationship
+    try:
+        with driver.session() as session:
+            result = session.run(cypher_query)
+            first = result.peek()
+            if (
+                first is not None
+                and hasattr(result, "to_df")
+                and any(isinstance(value, (Node, Relationship, Path)) for value in first.values())
+            ):
+                # Expand nodes and relationships into property columns instead of raw objects
+                return result.to_df(expand=True), None
+            # Plain values go straight into columns without building a dict per record
+            keys = result.keys()
+            return pd.DataFrame(result.values(*keys), columns=keys), None
+    except Exception as e:
+        return None, str(e)
+
+# Concurrent Groq requests when generating queries for several questions
+LLM_BATCH_CONCURRENCY = 8
+
+def lookup_cached_queries(question, ddl_schema, neo4j_schema):
+    """Return ((sql_query, cypher_query) or None, question embedding) from the LLM caches."""
+    llm_cache = get_llm_cache()
+    cache_key = llm_cache_key(question, ddl_schema, neo4j_schema, GROQ_MODEL_NAME)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        if time.time() - cached[0] < LLM_CACHE_TTL:
+            st.info(f"Reusing cached queries for: {question}")
+            return cached[1], None
+        # Drop expired entries so the process-wide cache doesn't grow without bound
+        llm_cache.pop(cache_key, None)
+    
+    # Fall back to queries generated for a paraphrase of this question
+    question_vec, similar = semantic_cache_lookup(question, (ddl_schema, neo4j_schema, GROQ_MODEL_NAME))
+    if similar is not None:
+        similar_question, sql_query, cypher_query = similar
+        # Not promoted to the exact-match cache: an approximate match shouldn't be
+        # served to every session as if it had been generated for this question
+        st.info(f"Reusing cached queries for a similar question: {similar_question}")
+        return (sql_query, cypher_query), question_vec
+    return None, question_vec
+
+def forget_cached_queries(question, ddl_schema, neo4j_schema, sql_query, cypher_query):
+    """Drop a failed query pair from both cache tiers so the next attempt regenerates it."""
+    get_llm_cache().pop(llm_cache_key(question, ddl_schema, neo4j_schema, GROQ_MODEL_NAME), None)
+    semantic_cache_forget((ddl_schema, neo4j_schema, GROQ_MODEL_NAME), sql_query, cypher_query)
+
+def store_cached_queries(question, ddl_schema, neo4j_schema, question_vec, sql_query, cypher_query):
+    llm_cache = get_llm_cache()
+    now = time.time()
+    # Prune expired entries, then the oldest ones, so keys that are never looked
+    # up again don't accumulate; iterate over a snapshot since sessions share the dict
+    for key, (stored_at, _) in list(llm_cache.items()):
+        if now - stored_at >= LLM_CACHE_TTL:
+            llm_cache.pop(key, None)
+    cache_key = llm_cache_key(question, ddl_schema, neo4j_schema, GROQ_MODEL_NAME)
+    llm_cache.pop(cache_key, None)
+    for key in list(llm_cache)[:max(0, len(llm_cache) - LLM_CACHE_MAX_ENTRIES + 1)]:
+        llm_cache.pop(key, None)
+    llm_cache[cache_key] = (now, (sql_query, cypher_query))
+    semantic_cache_add((ddl_schema, neo4j_schema, GROQ_MODEL_NAME), question_vec, question, sql_query, cypher_query)
+
+def stream_model_output(api_key, inputs):
+    """Run the generation chain, showing tokens as they arrive, and return the full text."""
+    st.markdown("**Model Output**")
+    stream_placeholder = st.empty()
+    raw_output = ""
+    last_render = 0.0
+    for chunk in get_queries_chain(api_key).stream(inputs):
+        raw_output += chunk
+        # Batch updates to avoid re-rendering on every token
+        if time.monotonic() - last_render >= STREAM_RENDER_INTERVAL:
+            stream_placeholder.code(raw_output, language="json")
+            last_render = time.monotonic()
+    stream_placeholder.code(raw_output, language="json")
+    return raw_output
+
+def finish_queries(api_key, question, raw_output, ddl_schema, neo4j_schema):
+    """Parse the model output into (sql_query, cypher_query), repairing invalid queries."""
+    queries = get_queries_parser().parse(raw_output)
+    # Catch syntax errors locally before paying a database round trip
+    sql_query = repair_query(
+        api_key, "SQL", ddl_schema, question, clean_sql_query(queries.sql), validate_sql, clean_sql_query
+    )
+    cypher_query = repair_query(
+        api_key, "Neo4j Cypher", neo4j_schema, question, queries.cypher, validate_cypher
+    )
+    return sql_query, cypher_query
+
+def execute_queries(sql_query, cypher_query):
+    """Execute SQL and Cypher queries concurrently.
+
+    Returns (sql_results, cypher_results, cypher_error, succeeded), where
+    succeeded is False if either database rejected its query.
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        try:
+            sql_future = executor.submit(
+                run_sql_query, get_pg_pool(), sql_query, st.session_state["pg_seen_queries"]
+            )
+        except Exception as e:
+            sql_future = None
+            sql_error = str(e)
+        try:
+            driver = get_neo4j_driver(neo4j_uri, neo4j_username, neo4j_password)
+            cypher_future = executor.submit(run_cypher_query, driver, cypher_query)
+        except Exception as e:
+            cypher_future = None
+            cypher_error = str(e)
+        if sql_future is not None:
+            sql_results, sql_error = sql_future.result()
+        if cypher_future is not None:
+            cypher_results, cypher_error = cypher_future.result()
+    
+    if sql_error:
+        sql_results = f"Error executing SQL query: {sql_error}"
+    if cypher_error:
+        cypher_results = None
+    return sql_results, cypher_results, cypher_error, not sql_error and not cypher_error
+
+def render_results(sql_query, cypher_query, sql_results, cypher_results, cypher_error=None):
+    # Create two columns for displaying results
+    neo4j_col, sql_col = st.columns(2)
+    
+    # Neo4j Results (Left Column)
+    with neo4j_col:
+        st.markdown("**Neo4j Cypher Query**")
+        st.code(cypher_query, language="cypher")
+        
+        if cypher_results is not None:
+            st.markdown("**Neo4j Result**")
+            st.dataframe(cypher_results)
+        elif cypher_error:
+            st.error(f"Error executing Cypher query: {cypher_error}")
+        else:
+            st.warning("Cypher query execution failed or returned no results.")
+    
+    # SQL Results (Right Column)
+    with sql_col:
+        st.markdown("**SQL Query**")
+        st.code(sql_query, language="sql")
+        
+        if sql_results is not None:
+            st.markdown("**SQL Result**")
+            st.dataframe(sql_results)
+        else:
+            st.warning("SQL query execution failed or returned no results.")
+
+def render_results_panel():
+    """Render the last run's queries and results kept in session state."""
+    query_results = st.session_state.get("query_results")
+    if not query_results:
+        return
+    
+    st.subheader("Generated Queries and Results")
+    for entry in query_results["entries"]:
+        if query_results["batch"]:
+            st.markdown(f"#### {entry['question']}")
+        if entry.get("error"):
+            st.error(f"Could not generate queries: {entry['error']}")
+            continue
+        render_results(
+            entry["sql_query"], entry["cypher_query"], entry["sql_results"], entry["cypher_results"], entry["cypher_error"]
+        )
+
+# Results from other schemas or databases would be shown as if they were current
+results_key = (pg_pool_key, neo4j_uri, neo4j_username, neo4j_password, sql_ddl_schema, neo4j_schema)
+if st.session_state.get("query_results_key") != results_key:
+    st.session_state["query_results"] = None
+    st.session_state["query_results_key"] = results_key
+
+# st.fragment reruns only this section when its widgets change, so editing the
+# question doesn't rerun the whole page; older Streamlit versions lack it
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", lambda func: func)
+
+@fragment
+def query_generator_section():
+    # Question input
+    question = st.text_area("Enter your question", height=100, placeholder="What courses are taught by instructors with 'AI' in their bio?")
+    batch_mode = st.checkbox("Batch mode (one question per line)")
+    
+    # API Key for model
+    with st.expander("Model Configuration", expanded=False):
+        groq_api_key = st.text_input("GROQ API Key", type="password")
+        if groq_api_key:
+            os.environ["GROQ_API_KEY"] = groq_api_key
+    
+    # Process button
+    if st.button("Generate Queries and Execute"):
+        if batch_mode:
+            # One question per line; duplicates are only generated and run once
+            questions = list(dict.fromkeys(line.strip() for line in question.splitlines() if line.strip()))
+        else:
+            questions = [question] if question else []
+    
+        if not questions:
+            st.error("Please enter a question.")
+        elif not groq_api_key:
+            st.error("GROQ API Key not set. Please add it above.")
+        else:
+            st.session_state["query_results"] = None
+            with st.spinner("Generating queries and executing..."):
                 try:
-                    driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_username, neo4j_password))
-                    with driver.session() as session:
-                        result = session.run(cypher_query)
-                        cypher_results = [record.data() for record in result]
-                    driver.close()
-                except Exception as e:
-                    cypher_results = None
-                    st.error(f"Error executing Cypher query: {str(e)}")
+                    ddl_schema = sql_ddl_schema.strip()
+                    graph_schema = neo4j_schema.strip()
                 
-                # Display results
-                st.subheader("Generated Queries and Results")
+                    # Reuse previously generated queries where possible; questions whose
+                    # generation fails map to an error message instead of a query pair
+                    generated = {}
+                    failed = {}
+                    fresh_vecs = {}
+                    pending = []
+                    for q in questions:
+                        cached, question_vec = lookup_cached_queries(q, ddl_schema, graph_schema)
+                        if cached is not None:
+                            generated[q] = cached
+                        else:
+                            pending.append((q, question_vec))
                 
-                # Create two columns for displaying results
-                neo4j_col, sql_col = st.columns(2)
-                
-                # Neo4j Results (Left Column)
-                with neo4j_col:
-                    st.markdown("**Neo4j Cypher Query**")
-                    st.code(cypher_query, language="cypher")
+                    if pending:
+                        # Make sure the model is available
+                        if importlib.util.find_spec("langchain_groq") is None:
+                            st.error("ChatGroq is not available. Please install langchain_groq package with: pip install langchain_groq")
+                            st.stop()
                     
-                    if cypher_results is not None:
-                        st.markdown("**Neo4j Result**")
-                        st.json(cypher_results)
-                    else:
-                        st.warning("Cypher query execution failed or returned no results.")
-                
-                # SQL Results (Right Column)
-                with sql_col:
-                    st.markdown("**SQL Query**")
-                    st.code(sql_query, language="sql")
+                        inputs = [
+                            {"ddl_schema": ddl_schema, "schema": graph_schema, "question": q}
+                            for q, _ in pending
+                        ]
+                        if len(inputs) == 1:
+                            try:
+                                raw_outputs = [stream_model_output(groq_api_key, inputs[0])]
+                            except Exception as e:
+                                raw_outputs = [e]
+                        else:
+                            # Send every question at once; LangChain runs the requests concurrently
+                            # and returns failed requests (e.g. rate limits) as exceptions
+                            raw_outputs = get_queries_chain(groq_api_key).batch(
+                                inputs, config={"max_concurrency": LLM_BATCH_CONCURRENCY}, return_exceptions=True
+                            )
                     
-                    if sql_results is not None:
-                        st.markdown("**SQL Result**")
-                        st.dataframe(sql_results)
-                    else:
-                        st.warning("SQL query execution failed or returned no results.")
+                        for (q, question_vec), raw_output in zip(pending, raw_outputs):
+                            try:
+                                if isinstance(raw_output, Exception):
+                                    raise raw_output
+                                generated[q] = finish_queries(groq_api_key, q, raw_output, ddl_schema, graph_schema)
+                            except Exception as e:
+                                failed[q] = str(e)
+                                continue
+                            fresh_vecs[q] = question_vec
+                
+                    # Execute queries and keep the results for the results panel
+                    entries = []
+                    for q in questions:
+                        if q in failed:
+                            entries.append({"question": q, "error": failed[q]})
+                            continue
+                        sql_query, cypher_query = generated[q]
+                        sql_results, cypher_results, cypher_error, succeeded = execute_queries(sql_query, cypher_query)
+                        # Only cache pairs the databases accepted, so a retry regenerates broken queries
+                        if not succeeded:
+                            forget_cached_queries(q, ddl_schema, graph_schema, sql_query, cypher_query)
+                        elif q in fresh_vecs:
+                            store_cached_queries(q, ddl_schema, graph_schema, fresh_vecs[q], sql_query, cypher_query)
+                        entries.append({
+                            "question": q,
+                            "sql_query": sql_query,
+                            "cypher_query": cypher_query,
+                            "sql_results": sql_results,
+                            "cypher_results": cypher_results,
+                            "cypher_error": cypher_error
+                        })
+                    st.session_state["query_results"] = {"batch": batch_mode, "entries": entries}
             
-            except Exception as e:
-                st.error(f"An error occurred: {str(e)}")
+                except Exception as e:
+                    st.error(f"An error occurred: {str(e)}")
+    
+    # Display results
+    render_results_panel()
+
+query_generator_section()
 
 # Add footer
 st.markdown("---")